@@ -5,20 +5,29 @@ Hold the hotkey to record, release to transcribe and copy to clipboard.
 """
 
 import argparse
+import atexit
+import base64
 import configparser
+import ctypes
+import fcntl
+import functools
+import json
 import logging
+import queue
 import selectors
+import shutil
+import socket
+import socketserver
+import struct
 import subprocess
-import tempfile
 import threading
 import signal
 import sys
 import os
 from pathlib import Path
 
-import evdev
-from evdev import ecodes, UInput
-from faster_whisper import WhisperModel
+# numpy, evdev, faster_whisper and jeepney are imported where they are used
+# so that --help and --version don't pay for loading them
 
 __version__ = "0.1.0"
 
@@ -29,6 +38,53 @@ logger = logging.getLogger(__name__)
 # Load configuration
 CONFIG_PATH = Path.home() / ".config" / "soupawhisper" / "config.ini"
 
+# evdev ioctl: _IOW('E', 0x93, struct input_mask)
+EVIOCSMASK = 0x40104593
+
+# Start of the OSC52 "set clipboard" terminal escape sequence
+OSC52_PREFIX = b"\033]52;c;"
+
+# Unix socket used by --daemon to share a loaded model between instances
+SOCKET_PATH = Path.home() / ".cache" / "soupawhisper" / "sock"
+
+# Audio capture
+SAMPLE_RATE = 16000  # What Whisper expects
+MAX_RECORD_SECONDS = 300  # Size of the preallocated recording buffer
+READ_CHUNK_SIZE = 8192  # Bytes read from the recorder pipe at a time
+
+# Recorder commands writing raw 16-bit mono PCM to stdout, built once
+PW_RECORD_CMD = (
+    "pw-record",
+    "--format",
+    "s16",  # 16-bit signed
+    "--rate",
+    str(SAMPLE_RATE),
+    "--channels",
+    "1",  # Mono
+    "--raw",  # No container, just samples
+    "-",  # Write to stdout
+)
+ARECORD_CMD = (
+    "arecord",
+    "-f",
+    "S16_LE",  # Format: 16-bit little-endian
+    "-r",
+    str(SAMPLE_RATE),
+    "-c",
+    "1",  # Mono
+    "-t",
+    "raw",  # No container, just samples
+    "-",  # Write to stdout
+)
+
+# Voice activity detection (same defaults as faster-whisper's vad_filter)
+VAD_WINDOW = 512  # Samples scored per Silero VAD call
+VAD_CONTEXT = 64  # Samples of the previous window prepended to each window
+VAD_THRESHOLD = 0.5  # Speech probability above which a window is voiced
+VAD_NEG_THRESHOLD = VAD_THRESHOLD - 0.15  # Probability below which speech ends
+VAD_MIN_SILENCE_MS = 2000  # Silence needed to split speech segments
+VAD_SPEECH_PAD_MS = 400  # Padding added around each speech segment
+
 
 def load_config():
     config = configparser.ConfigParser()
@@ -37,11 +93,13 @@ def load_config():
     defaults = {
         "model": "base.en",
         "device": "cpu",
-        "compute_type": "int8",
+        "compute_type": "auto",
+        "language": "en",
         "key": "f12",
         "auto_type": "true",
         "notifications": "true",
         "grab_keyboard": "false",
+        "osc52": "false",
     }
 
     if CONFIG_PATH.exists():
@@ -53,47 +111,59 @@ def load_config():
         "compute_type": config.get(
             "whisper", "compute_type", fallback=defaults["compute_type"]
         ),
+        "language": config.get("whisper", "language", fallback=defaults["language"]),
         "key": config.get("hotkey", "key", fallback=defaults["key"]),
         "auto_type": config.getboolean("behavior", "auto_type", fallback=True),
         "notifications": config.getboolean("behavior", "notifications", fallback=True),
         "grab_keyboard": config.getboolean("behavior", "grab_keyboard", fallback=False),
+        "osc52": config.getboolean("behavior", "osc52", fallback=False),
     }
 
 
 CONFIG = load_config()
 
 
-# Map key names to evdev key codes
+# Map key names to evdev key code names
 KEY_MAP = {
-    "f1": ecodes.KEY_F1,
-    "f2": ecodes.KEY_F2,
-    "f3": ecodes.KEY_F3,
-    "f4": ecodes.KEY_F4,
-    "f5": ecodes.KEY_F5,
-    "f6": ecodes.KEY_F6,
-    "f7": ecodes.KEY_F7,
-    "f8": ecodes.KEY_F8,
-    "f9": ecodes.KEY_F9,
-    "f10": ecodes.KEY_F10,
-    "f11": ecodes.KEY_F11,
-    "f12": ecodes.KEY_F12,
-    "scroll_lock": ecodes.KEY_SCROLLLOCK,
-    "pause": ecodes.KEY_PAUSE,
-    "insert": ecodes.KEY_INSERT,
-    "home": ecodes.KEY_HOME,
-    "end": ecodes.KEY_END,
-    "pageup": ecodes.KEY_PAGEUP,
-    "pagedown": ecodes.KEY_PAGEDOWN,
-    "capslock": ecodes.KEY_CAPSLOCK,
-    "numlock": ecodes.KEY_NUMLOCK,
+    "f1": "KEY_F1",
+    "f2": "KEY_F2",
+    "f3": "KEY_F3",
+    "f4": "KEY_F4",
+    "f5": "KEY_F5",
+    "f6": "KEY_F6",
+    "f7": "KEY_F7",
+    "f8": "KEY_F8",
+    "f9": "KEY_F9",
+    "f10": "KEY_F10",
+    "f11": "KEY_F11",
+    "f12": "KEY_F12",
+    "scroll_lock": "KEY_SCROLLLOCK",
+    "pause": "KEY_PAUSE",
+    "insert": "KEY_INSERT",
+    "home": "KEY_HOME",
+    "end": "KEY_END",
+    "pageup": "KEY_PAGEUP",
+    "pagedown": "KEY_PAGEDOWN",
+    "capslock": "KEY_CAPSLOCK",
+    "numlock": "KEY_NUMLOCK",
 }
 
 
+@functools.cache
+def get_key_map_rev():
+    """Reverse lookup from key code to display name, built once."""
+    from evdev import ecodes
+
+    return {getattr(ecodes, attr): name.upper() for name, attr in KEY_MAP.items()}
+
+
 def get_hotkey(key_name):
     """Map key name to evdev key code."""
+    from evdev import ecodes
+
     key_name = key_name.lower()
     if key_name in KEY_MAP:
-        return KEY_MAP[key_name]
+        return getattr(ecodes, KEY_MAP[key_name])
     elif len(key_name) == 1:
         # Single character keys (a-z, 0-9)
         key_attr = f"KEY_{key_name.upper()}"
@@ -105,9 +175,11 @@ def get_hotkey(key_name):
 
 def get_key_name(keycode):
     """Get human-readable name for a key code."""
-    for name, code in KEY_MAP.items():
-        if code == keycode:
-            return name.upper()
+    from evdev import ecodes
+
+    key_map_rev = get_key_map_rev()
+    if keycode in key_map_rev:
+        return key_map_rev[keycode]
     # Try to get from ecodes
     name = ecodes.KEY.get(keycode, f"KEY_{keycode}")
     if isinstance(name, list):
@@ -115,82 +187,375 @@ def get_key_name(keycode):
     return name.replace("KEY_", "")
 
 
-HOTKEY = get_hotkey(CONFIG["key"])
+def resolve_compute_type(compute_type, device):
+    """Resolve compute_type = auto to dynamic int8 quantization for the device."""
+    if compute_type != "auto":
+        return compute_type
+    # int8 weights with float16 activations on GPU, plain int8 on CPU
+    return {"cuda": "int8_float16", "cpu": "int8"}.get(device, "int8")
+
+
 MODEL_SIZE = CONFIG["model"]
 DEVICE = CONFIG["device"]
-COMPUTE_TYPE = CONFIG["compute_type"]
+COMPUTE_TYPE = resolve_compute_type(CONFIG["compute_type"], DEVICE)
+# None lets faster-whisper detect the language on every transcription
+LANGUAGE = None if CONFIG["language"] == "auto" else CONFIG["language"]
 AUTO_TYPE = CONFIG["auto_type"]
 NOTIFICATIONS = CONFIG["notifications"]
 GRAB_KEYBOARD = CONFIG["grab_keyboard"]
+OSC52 = CONFIG["osc52"]
 
 
 def copy_to_clipboard(text):
-    """Copy text to clipboard using wl-copy (Wayland) or xclip (X11)."""
-    if os.environ.get("WAYLAND_DISPLAY"):
-        logger.debug("Running: wl-copy")
-        process = subprocess.Popen(["wl-copy"], stdin=subprocess.PIPE)
-        process.communicate(input=text.encode())
-    elif os.environ.get("DISPLAY"):
-        logger.debug("Running: xclip -selection clipboard")
-        process = subprocess.Popen(
-            ["xclip", "-selection", "clipboard"], stdin=subprocess.PIPE
-        )
+    """Copy text to clipboard using wl-copy (Wayland) or xclip (X11).
+
+    Returns whether the text was handed to a clipboard at all.
+    """
+    if OSC52:
+        # Ask the terminal to set the clipboard (works over SSH)
+        sys.stdout.flush()  # Keep ordering with text already written
+        out = sys.stdout.buffer
+        out.write(OSC52_PREFIX)
+        out.write(base64.b64encode(text.encode()))
+        out.write(b"\007")
+        out.flush()
+
+    clipboard_cmd = get_clipboard_command()
+    if clipboard_cmd:
+        logger.debug(f"Running: {' '.join(clipboard_cmd)}")
+        process = subprocess.Popen(clipboard_cmd, stdin=subprocess.PIPE)
         process.communicate(input=text.encode())
+        return True
+    return OSC52
 
 
-def type_text(text):
-    """Type text into the active input field using wtype (Wayland) or xdotool (X11)."""
+def start_typing():
+    """Start a typer fed through stdin: wtype (Wayland) or xdotool (X11)."""
     if os.environ.get("WAYLAND_DISPLAY"):
         # Wayland: use wtype
-        logger.debug("Running: wtype <text>")
-        subprocess.run(["wtype", text])
+        type_cmd = ["wtype", "-"]
     else:
         # X11: use xdotool
-        logger.debug("Running: xdotool type --clearmodifiers <text>")
-        subprocess.run(["xdotool", "type", "--clearmodifiers", text])
+        type_cmd = ["xdotool", "type", "--clearmodifiers", "--file", "-"]
+    logger.debug(f"Running: {' '.join(type_cmd)}")
+    return subprocess.Popen(type_cmd, stdin=subprocess.PIPE)
+
+
+@functools.cache
+def _have(cmd):
+    """Check whether a command is on PATH (cached, no subprocess)."""
+    return shutil.which(cmd) is not None
 
 
+@functools.cache
 def get_audio_recorder():
     """Determine which audio recorder to use: pw-record (PipeWire) or arecord (ALSA)."""
-    if subprocess.run(["which", "pw-record"], capture_output=True).returncode == 0:
+    if _have("pw-record"):
         return "pipewire"
-    elif subprocess.run(["which", "arecord"], capture_output=True).returncode == 0:
+    elif _have("arecord"):
         return "alsa"
     return None
 
 
-def get_record_command(output_file):
-    """Get the command to record audio to the specified file."""
-    recorder = get_audio_recorder()
-    if recorder == "pipewire":
-        return [
-            "pw-record",
-            "--format",
-            "s16",  # 16-bit signed
-            "--rate",
-            "16000",  # Sample rate: 16kHz (what Whisper expects)
-            "--channels",
-            "1",  # Mono
-            output_file,
-        ]
-    else:
-        # ALSA fallback
-        return [
-            "arecord",
-            "-f",
-            "S16_LE",  # Format: 16-bit little-endian
-            "-r",
-            "16000",  # Sample rate: 16kHz (what Whisper expects)
-            "-c",
-            "1",  # Mono
-            "-t",
-            "wav",
-            output_file,
-        ]
+@functools.cache
+def get_clipboard_command():
+    """Determine which clipboard command to use: wl-copy (Wayland) or xclip (X11)."""
+    if os.environ.get("WAYLAND_DISPLAY") and _have("wl-copy"):
+        return ["wl-copy"]
+    elif os.environ.get("DISPLAY") and _have("xclip"):
+        return ["xclip", "-selection", "clipboard"]
+    return None
+
+
+def get_record_command():
+    """Get the command to record raw PCM audio to stdout."""
+    if get_audio_recorder() == "pipewire":
+        return PW_RECORD_CMD
+    # ALSA fallback
+    return ARECORD_CMD
+
+
+def get_cpu_threads():
+    """Count the physical cores we may run on (SMT siblings share GEMM units)."""
+    logical = len(os.sched_getaffinity(0))
+    try:
+        smt = Path("/sys/devices/system/cpu/smt/active").read_text().strip() == "1"
+    except OSError:
+        smt = False
+    return max(1, logical // 2 if smt else logical)
+
+
+def get_cpu_int8_extensions():
+    """List the CPU's int8 dot product extensions (VNNI, AMX, Arm dotprod)."""
+    try:
+        cpuinfo = Path("/proc/cpuinfo").read_text()
+    except OSError:
+        return []
+    for line in cpuinfo.splitlines():
+        # x86 lists "flags", Arm lists "Features"
+        if line.startswith(("flags", "Features")):
+            flags = line.split(":", 1)[1].split()
+            return [
+                ext
+                for ext in ("avx512_vnni", "avx_vnni", "amx_int8", "asimddp")
+                if ext in flags
+            ]
+    return []
+
+
+def model_is_cached():
+    """Check whether the model snapshot is already in the local cache."""
+    try:
+        from faster_whisper import download_model
+
+        download_model(MODEL_SIZE, local_files_only=True)
+        return True
+    except Exception:
+        return False
+
+
+def load_model():
+    """Load the Whisper model, skipping the Hugging Face Hub check when cached."""
+    import numpy as np
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(
+        MODEL_SIZE,
+        device=DEVICE,
+        compute_type=COMPUTE_TYPE,
+        cpu_threads=get_cpu_threads(),
+        num_workers=1,
+        local_files_only=model_is_cached(),
+    )
+
+    # CTranslate2 silently falls back when a compute type isn't supported on
+    # the device, so check that int8 weights are really in use
+    effective_type = model.model.compute_type
+    logger.debug(f"Effective compute type: {effective_type}")
+    if COMPUTE_TYPE.startswith("int8") and not effective_type.startswith("int8"):
+        logger.warning(
+            f"compute_type {COMPUTE_TYPE} is not supported on {DEVICE}, "
+            f"running as {effective_type}"
+        )
+    if DEVICE == "cpu" and effective_type.startswith("int8"):
+        extensions = ", ".join(get_cpu_int8_extensions()) or "none"
+        logger.debug(f"CPU int8 dot product extensions: {extensions}")
+
+    # Run one second of silence through it so CUDA/cuDNN setup, kernel selection
+    # and thread pool startup happen now rather than on the first dictation
+    segments, info = model.transcribe(
+        np.zeros(SAMPLE_RATE, dtype=np.float32), beam_size=1, vad_filter=False
+    )
+    list(segments)
+    return model
+
+
+def pcm_to_float(pcm):
+    """Convert 16-bit PCM to the float32 [-1, 1] range faster-whisper expects."""
+    import numpy as np
+
+    return pcm.astype(np.float32) * (1.0 / 32768.0)
+
+
+def get_beam_size(num_samples):
+    """Pick a beam size for the utterance: greedy for short commands."""
+    duration = num_samples / SAMPLE_RATE
+    if duration < 3:
+        return 1
+    elif duration < 10:
+        return 3
+    return 5
+
+
+def transcribe(model, audio):
+    """Transcribe float32 audio, yielding each segment's text as it is decoded."""
+    beam_size = get_beam_size(len(audio))
+    segments, info = model.transcribe(
+        audio,
+        language=LANGUAGE,
+        beam_size=beam_size,
+        best_of=beam_size,
+        vad_filter=False,  # Silence is already trimmed by the caller
+        condition_on_previous_text=False,  # Each dictation stands alone
+        # Skip timestamp tokens when the audio fits in one 30 s window. Longer
+        # audio needs them to seek at segment ends instead of cutting words
+        without_timestamps=len(audio) <= 30 * SAMPLE_RATE,
+        word_timestamps=False,
+    )
+    for segment in segments:
+        yield segment.text.strip()
+
+
+def transcribe_batch(model, audios):
+    """Transcribe float32 clips of up to 30 s each in one batched pass.
+
+    Returns the segment texts of each clip, in the order the clips were given.
+    """
+    import bisect
+
+    import numpy as np
+    from faster_whisper import BatchedInferencePipeline
+
+    # Each clip is decoded as its own batch item, nothing is spliced together
+    offsets = (np.cumsum([0] + [len(audio) for audio in audios]) / SAMPLE_RATE).tolist()
+    clips = [{"start": start, "end": end} for start, end in zip(offsets, offsets[1:])]
+    beam_size = get_beam_size(max(len(audio) for audio in audios))
+    segments, info = BatchedInferencePipeline(model).transcribe(
+        np.concatenate(audios),
+        language=LANGUAGE,
+        beam_size=beam_size,
+        best_of=beam_size,
+        clip_timestamps=clips,
+        batch_size=len(audios),
+        without_timestamps=True,
+        word_timestamps=False,
+    )
+    # Segment start times are offset by their clip's start in the joined audio.
+    # Match how faster-whisper truncates the start to a sample and rounds it
+    starts = [
+        round(int(start * SAMPLE_RATE) / SAMPLE_RATE, 3) for start in offsets[:-1]
+    ]
+    texts = [[] for _ in audios]
+    for segment in segments:
+        clip = bisect.bisect_right(starts, segment.start) - 1
+        texts[clip].append(segment.text.strip())
+    return texts
+
+
+class StreamingVAD:
+    """Silero VAD scored incrementally while audio is being recorded.
+
+    Drives the ONNX session faster-whisper uses for vad_filter, carrying the
+    LSTM state between calls so each window is scored exactly once.
+    """
+
+    def __init__(self):
+        from faster_whisper.vad import get_vad_model
+
+        self.session = get_vad_model().session
+        inputs = sorted(i.name for i in self.session.get_inputs())
+        if inputs != ["c", "h", "input"]:
+            raise RuntimeError(f"Unsupported Silero VAD model inputs: {inputs}")
+        self.reset()
+
+    def reset(self):
+        import numpy as np
+
+        self.h = np.zeros((1, 1, 128), dtype=np.float32)
+        self.c = np.zeros((1, 1, 128), dtype=np.float32)
+        self.context = np.zeros((1, VAD_CONTEXT), dtype=np.float32)
+        self.probs = []
+
+    def feed(self, audio):
+        """Score float32 audio whose length is a multiple of VAD_WINDOW."""
+        import numpy as np
+
+        windows = audio.reshape(-1, VAD_WINDOW)
+        context = np.vstack([self.context, windows[:-1, -VAD_CONTEXT:]])
+        probs, self.h, self.c = self.session.run(
+            None,
+            {
+                "input": np.concatenate([context, windows], axis=1),
+                "h": self.h,
+                "c": self.c,
+            },
+        )
+        self.context = windows[-1:, -VAD_CONTEXT:]
+        self.probs.extend(probs.ravel().tolist())
+
+
+def speech_segments(probs, num_samples):
+    """Turn per-window speech probabilities into padded (start, end) samples."""
+    min_silence = VAD_MIN_SILENCE_MS * SAMPLE_RATE // 1000
+    pad = VAD_SPEECH_PAD_MS * SAMPLE_RATE // 1000
+    segments = []
+    start = silence = None
+    for i, prob in enumerate(probs):
+        if prob >= VAD_THRESHOLD:
+            if start is None:
+                start = i * VAD_WINDOW
+            silence = None
+        elif start is not None and prob < VAD_NEG_THRESHOLD:
+            # Quieter speech between the thresholds keeps the segment going
+            if silence is None:
+                silence = i * VAD_WINDOW
+            if i * VAD_WINDOW - silence >= min_silence:
+                segments.append((start, silence))
+                start = silence = None
+    if start is not None:
+        segments.append((start, num_samples))
+    return [
+        (max(0, start - pad), min(num_samples, end + pad)) for start, end in segments
+    ]
+
+
+def print_model_error(e):
+    """Report a model loading failure with a hint for GPU setups."""
+    print(f"Failed to load model: {e}")
+    if "cudnn" in str(e).lower() or "cuda" in str(e).lower():
+        print(
+            "Hint: Try setting device = cpu in your config, "
+            "or install cuDNN (NVIDIA) / ROCm (AMD)."
+        )
+
+
+def daemon_available():
+    """Check whether a daemon is listening on the socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(SOCKET_PATH))
+        return True
+    except OSError:
+        return False
+
+
+def transcribe_remote(pcm):
+    """Send 16-bit PCM to the daemon, yielding segment texts as they arrive."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(SOCKET_PATH))
+        sock.sendall(memoryview(pcm))
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            for line in f:
+                response = json.loads(line)
+                if "error" in response:
+                    raise RuntimeError(response["error"])
+                yield response["text"]
+
+
+class TranscribeHandler(socketserver.StreamRequestHandler):
+    """Read 16-bit PCM until EOF and reply with one JSON line per segment."""
+
+    def handle(self):
+        import numpy as np
+
+        pcm = np.frombuffer(self.rfile.read(), dtype=np.int16)
+        if not pcm.size:
+            return  # Connection probe from daemon_available()
+        try:
+            for text in transcribe(self.server.model, pcm_to_float(pcm)):
+                self.wfile.write(json.dumps({"text": text}).encode() + b"\n")
+        except Exception as e:
+            logger.warning(f"Transcription failed: {e}")
+            self.wfile.write(json.dumps({"error": str(e)}).encode() + b"\n")
+
+
+class WhisperServer(socketserver.UnixStreamServer):
+    """Hold a loaded Whisper model and serve transcriptions on SOCKET_PATH."""
+
+    def __init__(self):
+        self.model = load_model()
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+        SOCKET_PATH.unlink(missing_ok=True)  # Stale socket from a crashed daemon
+        super().__init__(str(SOCKET_PATH), TranscribeHandler)
+        atexit.register(SOCKET_PATH.unlink, missing_ok=True)
 
 
 def find_keyboards():
     """Find all keyboard input devices."""
+    import evdev
+    from evdev import ecodes
+
     keyboards = []
     for path in evdev.list_devices():
         try:
@@ -208,8 +573,34 @@ def find_keyboards():
     return keyboards
 
 
+def set_event_mask(device, keycode):
+    """Have the kernel deliver only the hotkey's events to us for this device.
+
+    Only EV_KEY events with the hotkey's code are let through, plus the EV_SYN
+    events that evdev never filters.
+    """
+    from evdev import ecodes
+
+    masks = [
+        (ecodes.EV_SYN, [ecodes.EV_KEY]),  # Mask of event types
+        (ecodes.EV_KEY, [keycode]),
+    ]
+    for event_type, codes in masks:
+        bits = bytearray(max(codes) // 8 + 1)
+        for code in codes:
+            bits[code // 8] |= 1 << (code % 8)
+        buf = ctypes.create_string_buffer(bytes(bits), len(bits))
+        fcntl.ioctl(
+            device.fd,
+            EVIOCSMASK,
+            struct.pack("IIQ", event_type, len(bits), ctypes.addressof(buf)),
+        )
+
+
 def create_uinput(keyboards):
     """Create a virtual keyboard that can re-inject events."""
+    from evdev import UInput, ecodes
+
     # Collect all capabilities from all keyboards
     all_caps = {}
     for kb in keyboards:
@@ -237,79 +628,235 @@ def create_uinput(keyboards):
 
 class Dictation:
     def __init__(self, grab=False):
+        import numpy as np
+        from evdev import ecodes
+
+        self.hotkey = get_hotkey(CONFIG["key"])
+        # Event type codes, looked up once for the per-event path
+        self.ev_key = ecodes.EV_KEY
+        self.ev_syn = ecodes.EV_SYN
         self.recording = False
-        self.record_process = None
-        self.temp_file = None
+        self.record_pid = None
+        self.record_fd = None
+        self.reader_thread = None
+        self.audio_buffer = np.empty(MAX_RECORD_SECONDS * SAMPLE_RATE, dtype=np.int16)
+        self.audio_bytes = 0
+        self.vad_samples = 0
         self.model = None
+        self.use_daemon = False
         self.model_loaded = threading.Event()
         self.model_error = None
         self.running = True
         self.keyboards = []
         self.selector = None
+        self.wakeup_fd = None
         self.uinput = None
         self.grab = grab
+        self.bus = None
+        self.notify_id = 0
+        self.notify_lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.vad = None
 
         # Load model in background
-        print(f"Loading Whisper model ({MODEL_SIZE})...")
         threading.Thread(target=self._load_model, daemon=True).start()
 
+        # Build the VAD off the main thread too, so it doesn't hold up the model
+        threading.Thread(target=self._load_vad, daemon=True).start()
+
+        # Transcribe off the event loop so the next recording can start at once
+        threading.Thread(target=self._transcribe_worker, daemon=True).start()
+
     def _load_model(self):
         try:
-            self.model = WhisperModel(
-                MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE
-            )
+            if daemon_available():
+                # A daemon already holds the model, skip loading our own
+                self.use_daemon = True
+                print(f"Using Whisper daemon at {SOCKET_PATH}")
+            else:
+                print(f"Loading Whisper model ({MODEL_SIZE})...")
+                self.model = load_model()
             self.model_loaded.set()
-            hotkey_name = get_key_name(HOTKEY)
+            hotkey_name = get_key_name(self.hotkey)
             print("Model loaded. Ready for dictation!")
             print(f"Hold [{hotkey_name}] to record, release to transcribe.")
             print("Press Ctrl+C to quit.")
         except Exception as e:
             self.model_error = str(e)
             self.model_loaded.set()
-            print(f"Failed to load model: {e}")
-            if "cudnn" in str(e).lower() or "cuda" in str(e).lower():
-                print(
-                    "Hint: Try setting device = cpu in your config, "
-                    "or install cuDNN (NVIDIA) / ROCm (AMD)."
-                )
+            print_model_error(e)
+
+    def _load_vad(self):
+        """Score speech while recording so silence can be dropped on release."""
+        try:
+            # Recordings made before this is ready are trimmed after the fact
+            self.vad = StreamingVAD()
+        except Exception as e:
+            logger.debug(f"Streaming VAD unavailable, trimming after recording: {e}")
 
     def notify(self, title, message, icon="dialog-information", timeout=2000):
-        """Send a desktop notification."""
+        """Send a desktop notification over D-Bus, replacing the previous one."""
         if not NOTIFICATIONS:
             return
-        subprocess.run(
-            [
-                "notify-send",
-                "-a",
-                "SoupaWhisper",
-                "-i",
-                icon,
-                "-t",
-                str(timeout),
-                "-h",
-                "string:x-canonical-private-synchronous:soupawhisper",
-                title,
-                message,
-            ],
-            capture_output=True,
+        from jeepney import DBusAddress, new_method_call
+        from jeepney.io.blocking import open_dbus_connection
+        from jeepney.wrappers import DBusErrorResponse, unwrap_msg
+
+        address = DBusAddress(
+            "/org/freedesktop/Notifications",
+            bus_name="org.freedesktop.Notifications",
+            interface="org.freedesktop.Notifications",
         )
+        # The event loop and the transcription worker both notify
+        with self.notify_lock:
+            msg = new_method_call(
+                address,
+                "Notify",
+                "susssasa{sv}i",
+                (
+                    "SoupaWhisper",
+                    self.notify_id,
+                    icon,
+                    title,
+                    message,
+                    [],
+                    {"x-canonical-private-synchronous": ("s", "soupawhisper")},
+                    timeout,
+                ),
+            )
+            try:
+                # Keep one session bus connection open instead of connecting per call
+                if self.bus is None:
+                    self.bus = open_dbus_connection(bus="SESSION")
+                reply = self.bus.send_and_get_reply(msg, timeout=1)
+                # Errors (e.g. no notification daemon) come back as replies
+                self.notify_id = unwrap_msg(reply)[0]
+            except DBusErrorResponse as e:
+                # The bus itself is fine, just don't replace a failed notification
+                logger.debug(f"Notification failed: {e}")
+                self.notify_id = 0
+            except Exception as e:
+                logger.debug(f"Notification failed: {e}")
+                self.notify_id = 0
+                if self.bus:
+                    self.bus.close()
+                self.bus = None
+
+    def _read_audio(self, fd):
+        """Read raw PCM from the recorder pipe into the preallocated buffer."""
+        import numpy as np
+
+        buffer = memoryview(self.audio_buffer.view(np.uint8))
+        while True:
+            if self.audio_bytes < len(buffer):
+                end = min(self.audio_bytes + READ_CHUNK_SIZE, len(buffer))
+                n = os.readv(fd, [buffer[self.audio_bytes : end]])
+                self.audio_bytes += n
+            else:
+                # Buffer full: keep draining so the recorder doesn't block
+                n = len(os.read(fd, READ_CHUNK_SIZE))
+            if n == 0:
+                break
+            if self.vad:
+                try:
+                    self._feed_vad()
+                except Exception as e:
+                    logger.warning(f"Streaming VAD failed: {e}")
+                    self.vad = None
+        if self.audio_bytes >= len(buffer):
+            logger.warning(f"Recording truncated to {MAX_RECORD_SECONDS} seconds")
+
+    def _feed_vad(self, final=False):
+        """Run VAD over recorded samples that haven't been scored yet."""
+        import numpy as np
+
+        pcm = self.audio_buffer[self.vad_samples : self.audio_bytes // 2]
+        if not final:
+            # Leave the partial window for the next read
+            pcm = pcm[: len(pcm) - len(pcm) % VAD_WINDOW]
+        if not len(pcm):
+            return
+        audio = pcm_to_float(pcm)
+        if final:
+            audio = np.pad(audio, (0, -len(audio) % VAD_WINDOW))
+        self.vad.feed(audio)
+        self.vad_samples += len(pcm)
+
+    def _trim_silence(self, pcm):
+        """Keep only the voiced parts of the recording."""
+        import numpy as np
+        from faster_whisper.vad import get_speech_timestamps
+
+        if self.vad:
+            self._feed_vad(final=True)
+            segments = speech_segments(self.vad.probs, len(pcm))
+        else:
+            segments = [
+                (chunk["start"], chunk["end"])
+                for chunk in get_speech_timestamps(pcm_to_float(pcm))
+            ]
+        if not segments:
+            return pcm[:0]
+        return np.concatenate([pcm[start:end] for start, end in segments])
+
+    def _type_segments(self, segments):
+        """Join segment texts, typing each one as soon as it is decoded."""
+        parts = []
+        typer = None
+        try:
+            for segment_text in segments:
+                if not segment_text:
+                    continue
+                # Type it into the active input field while later segments decode
+                if AUTO_TYPE:
+                    if typer is None:
+                        typer = start_typing()
+                    separator = " " if parts else ""
+                    typer.stdin.write((separator + segment_text).encode())
+                    typer.stdin.flush()
+                parts.append(segment_text)
+        finally:
+            if typer:
+                typer.stdin.close()
+                typer.wait()
+        return " ".join(parts)
 
     def start_recording(self):
-        if self.recording or self.model_error:
+        if self.recording:
+            return
+        # Without a model, only record if a daemon has come up since
+        if self.model_error and not daemon_available():
             return
 
         self.recording = True
-        self.temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        self.temp_file.close()
+        self.audio_bytes = 0
+        self.vad_samples = 0
+        if self.vad:
+            self.vad.reset()
 
         # Record using pw-record (PipeWire) or arecord (ALSA)
-        record_cmd = get_record_command(self.temp_file.name)
+        record_cmd = get_record_command()
         logger.debug(f"Running: {' '.join(record_cmd)}")
-        self.record_process = subprocess.Popen(
-            record_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        # posix_spawn avoids copying our (model-sized) page tables like fork does
+        self.record_fd, write_fd = os.pipe()
+        try:
+            self.record_pid = os.posix_spawnp(
+                record_cmd[0],
+                record_cmd,
+                os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, write_fd, 1),
+                    (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+                ],
+            )
+        finally:
+            os.close(write_fd)
+        self.reader_thread = threading.Thread(
+            target=self._read_audio, args=(self.record_fd,), daemon=True
         )
+        self.reader_thread.start()
         print("Recording...")
-        hotkey_name = get_key_name(HOTKEY)
+        hotkey_name = get_key_name(self.hotkey)
         self.notify(
             "Recording...",
             f"Release {hotkey_name} when done",
@@ -323,45 +870,124 @@ class Dictation:
 
         self.recording = False
 
-        if self.record_process:
-            self.record_process.terminate()
-            self.record_process.wait()
-            self.record_process = None
+        if self.record_pid:
+            os.kill(self.record_pid, signal.SIGTERM)
+            os.waitpid(self.record_pid, 0)
+            self.reader_thread.join()
+            os.close(self.record_fd)
+            self.record_pid = None
+            self.record_fd = None
+            self.reader_thread = None
+
+        samples = self.audio_bytes // 2
 
         print("Transcribing...")
         self.notify(
             "Transcribing...", "Processing your speech", "emblem-synchronizing", 30000
         )
 
+        # Trimming copies the voiced audio out, freeing the buffer for the next
+        # recording while the worker transcribes this one
+        try:
+            pcm = self._trim_silence(self.audio_buffer[:samples])
+        except Exception as e:
+            print(f"Error: {e}")
+            self.notify("Error", str(e)[:50], "dialog-error", 3000)
+            return
+        logger.debug(f"VAD kept {len(pcm)} of {samples} samples")
+        self.pending.put(pcm)
+
+    def _transcribe_worker(self):
+        """Transcribe queued recordings in order, batching any backlog."""
+        while True:
+            batch = [self.pending.get()]
+            # Recordings made while the previous one was transcribing
+            while not self.pending.empty():
+                batch.append(self.pending.get_nowait())
+            decoded = self._decode_backlog(batch) if len(batch) > 1 else {}
+            for i, pcm in enumerate(batch):
+                self._transcribe(pcm, decoded.get(i))
+
+    def _decode_backlog(self, batch):
+        """Decode a backlog of recordings in one batched pass of the model.
+
+        Returns segment texts by batch index. Only recordings that fit in one
+        30 s window are batched, and only with a local model; the rest are left
+        for _transcribe to handle one by one.
+        """
+        self.model_loaded.wait()
+        if self.use_daemon or self.model is None:
+            return {}
+        indices = [i for i, pcm in enumerate(batch) if 0 < len(pcm) <= 30 * SAMPLE_RATE]
+        if len(indices) < 2:
+            return {}
+        logger.debug(f"Transcribing {len(indices)} queued recordings as one batch")
+        try:
+            texts = transcribe_batch(
+                self.model, [pcm_to_float(batch[i]) for i in indices]
+            )
+        except Exception as e:
+            logger.warning(f"Batched transcription failed, retrying one by one: {e}")
+            return {}
+        return dict(zip(indices, texts))
+
+    def _segments(self, pcm):
+        """Transcribe with the daemon if there is one, else with a local model."""
+        if self.use_daemon:
+            received = False
+            try:
+                for text in transcribe_remote(pcm):
+                    received = True
+                    yield text
+                return
+            except OSError as e:
+                if received:
+                    raise  # Segments were already typed, don't repeat them
+                logger.debug(f"Whisper daemon request failed: {e}")
+            if daemon_available():
+                # The daemon came back (e.g. restarted by systemd), retry once
+                yield from transcribe_remote(pcm)
+                return
+            print("Whisper daemon went away, falling back to a local model")
+            self.use_daemon = False
+
+        if self.model is None:
+            print(f"Loading Whisper model ({MODEL_SIZE})...")
+            self.model = load_model()
+        yield from transcribe(self.model, pcm_to_float(pcm))
+
+    def _transcribe(self, pcm, segments=None):
         # Wait for model if not loaded yet
         self.model_loaded.wait()
 
         if self.model_error:
-            print("Cannot transcribe: model failed to load")
-            self.notify("Error", "Model failed to load", "dialog-error", 3000)
-            return
+            if not daemon_available():
+                print("Cannot transcribe: model failed to load")
+                self.notify("Error", "Model failed to load", "dialog-error", 3000)
+                return
+            # A daemon was started after our own model failed to load
+            print(f"Using Whisper daemon at {SOCKET_PATH}")
+            self.use_daemon = True
+            self.model_error = None
 
         # Transcribe
         try:
-            segments, info = self.model.transcribe(
-                self.temp_file.name,
-                beam_size=5,
-                vad_filter=True,
-            )
-
-            text = " ".join(segment.text.strip() for segment in segments)
+            text = ""
+            if len(pcm):
+                if segments is None:
+                    segments = self._segments(pcm)
+                text = self._type_segments(segments)
 
             if text:
-                # Copy to clipboard using OSC52
-                copy_to_clipboard(text)
-
-                # Type it into the active input field
-                if AUTO_TYPE:
-                    type_text(text)
-
-                print(f"Copied: {text}")
+                # Copy to clipboard once the whole text is known
+                if copy_to_clipboard(text):
+                    print(f"Copied: {text}")
+                    title = "Copied!"
+                else:
+                    print(f"Transcribed: {text}")
+                    title = "Transcribed"
                 self.notify(
-                    "Copied!",
+                    title,
                     text[:100] + ("..." if len(text) > 100 else ""),
                     "emblem-ok-symbolic",
                     3000,
@@ -375,14 +1001,11 @@ class Dictation:
         except Exception as e:
             print(f"Error: {e}")
             self.notify("Error", str(e)[:50], "dialog-error", 3000)
-        finally:
-            # Cleanup temp file
-            if self.temp_file and os.path.exists(self.temp_file.name):
-                os.unlink(self.temp_file.name)
 
     def handle_event(self, event):
         """Handle an input event - suppress hotkey if grabbing, forward everything else."""
-        if event.type == ecodes.EV_KEY and event.code == HOTKEY:
+        # Compare the code first: it rules out almost every event on its own
+        if event.code == self.hotkey and event.type == self.ev_key:
             # This is our hotkey - handle it and DON'T forward
             if event.value == 1:  # Key press
                 self.start_recording()
@@ -394,7 +1017,7 @@ class Dictation:
         # Forward all other events to the virtual keyboard (only if grabbing)
         if self.grab and self.uinput:
             self.uinput.write_event(event)
-            if event.type != ecodes.EV_SYN:
+            if event.type != self.ev_syn:
                 # Send a SYN event after each non-SYN event
                 self.uinput.syn()
 
@@ -413,9 +1036,9 @@ class Dictation:
     def stop(self):
         print("\nExiting...")
         self.running = False
-        self.cleanup()
-        # Force immediate termination (evdev's select loop blocks signals)
-        os.kill(os.getpid(), signal.SIGKILL)
+        # Wake the event loop so it exits and cleans up
+        if self.wakeup_fd is not None:
+            os.write(self.wakeup_fd, b"\0")
 
     def run(self):
         self.keyboards = find_keyboards()
@@ -448,21 +1071,37 @@ class Dictation:
                 f"Monitoring {len(self.keyboards)} keyboard(s) with hotkey suppression..."
             )
         else:
+            # Nothing is forwarded, so let the kernel drop non-hotkey events
+            for kb in self.keyboards:
+                try:
+                    set_event_mask(kb, self.hotkey)
+                except OSError as e:
+                    logger.debug(f"Could not set event mask on {kb.name}: {e}")
             print(f"Monitoring {len(self.keyboards)} keyboard(s)...")
         for kb in self.keyboards:
             logger.debug(f"  {kb.name}")
 
+        # epoll (via selectors) releases the GIL while waiting, which the audio
+        # reader and model loading threads rely on. The liburing bindings hold
+        # it inside io_uring_wait_cqe, so they are not an option here.
         self.selector = selectors.DefaultSelector()
         for kb in self.keyboards:
             self.selector.register(kb, selectors.EVENT_READ)
 
+        # Self-pipe written by stop(), so select() can block without a timeout
+        wakeup_read, self.wakeup_fd = os.pipe()
+        self.selector.register(wakeup_read, selectors.EVENT_READ)
+
+        handle_event = self.handle_event
         try:
             while self.running:
-                for key, mask in self.selector.select(timeout=1):
+                for key, mask in self.selector.select():
+                    if key.fileobj == wakeup_read:
+                        continue
                     device = key.fileobj
                     try:
                         for event in device.read():
-                            self.handle_event(event)
+                            handle_event(event)
                     except OSError:
                         # Device disconnected
                         logger.debug(f"Device disconnected: {device.name}")
@@ -482,16 +1121,17 @@ def check_dependencies():
     if AUTO_TYPE:
         if os.environ.get("WAYLAND_DISPLAY"):
             # Wayland: need wtype
-            if subprocess.run(["which", "wtype"], capture_output=True).returncode != 0:
+            if not _have("wtype"):
                 missing.append(("wtype", "wtype"))
         else:
             # X11: need xdotool
-            if (
-                subprocess.run(["which", "xdotool"], capture_output=True).returncode
-                != 0
-            ):
+            if not _have("xdotool"):
                 missing.append(("xdotool", "xdotool"))
 
+    # Not fatal: the text can still be typed or sent over OSC52
+    if get_clipboard_command() is None and not OSC52:
+        print("Warning: wl-copy or xclip not found, text won't be copied")
+
     if missing:
         print("Missing dependencies:")
         for cmd, pkg in missing:
@@ -499,6 +1139,28 @@ def check_dependencies():
         sys.exit(1)
 
 
+def run_daemon():
+    """Load the model once and serve transcriptions until interrupted."""
+    if daemon_available():
+        print(f"Daemon already running at {SOCKET_PATH}")
+        sys.exit(1)
+
+    print(f"Loading Whisper model ({MODEL_SIZE})...")
+    try:
+        server = WhisperServer()
+    except Exception as e:
+        print_model_error(e)
+        sys.exit(1)
+
+    print(f"Model loaded. Serving transcriptions on {SOCKET_PATH}")
+    print("Press Ctrl+C to quit.")
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nExiting...")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="SoupaWhisper - Push-to-talk voice dictation"
@@ -509,6 +1171,11 @@ def main():
     parser.add_argument(
         "-d", "--debug", action="store_true", help="Enable debug logging"
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep the model loaded and serve transcriptions to other instances",
+    )
     args = parser.parse_args()
 
     if args.debug:
@@ -529,18 +1196,26 @@ def main():
         else "Unknown"
     )
     audio_backend = get_audio_recorder() or "None"
+    clipboard_cmd = get_clipboard_command()
     logger.debug(f"Display server: {display_server}")
     logger.debug(f"Audio backend: {audio_backend}")
+    logger.debug(f"Clipboard: {clipboard_cmd[0] if clipboard_cmd else 'None'}")
     logger.debug(f"Model: {MODEL_SIZE}, Device: {DEVICE}, Compute: {COMPUTE_TYPE}")
+    logger.debug(f"Language: {LANGUAGE or 'auto'}")
     logger.debug(
         f"Hotkey: {CONFIG['key']}, Auto-type: {AUTO_TYPE}, Notifications: {NOTIFICATIONS}"
     )
-    logger.debug(f"Grab keyboard: {GRAB_KEYBOARD}")
+    logger.debug(f"Grab keyboard: {GRAB_KEYBOARD}, OSC52: {OSC52}")
 
-    check_dependencies()
+    if args.daemon:
+        run_daemon()
+        return
 
+    # Start loading the model first so it overlaps with the dependency checks
     dictation = Dictation(grab=GRAB_KEYBOARD)
 
+    check_dependencies()
+
     # Handle Ctrl+C gracefully
     def handle_sigint(sig, frame):
         dictation.stop()